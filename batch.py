@@ -0,0 +1,45 @@
+# Server-side batch handshake engine: expensive part of phase 1 (pj, kj, wj, skj) for many pending logins
+# is spread across a pool of processes, so one server is not limited to one core by the GIL.
+# Public polynomial a is transformed to NTT domain once per worker (ZETAS tables are loaded with utils.ntt),
+# only the per-login verifier and pi are sent with every task.
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from endpoints import server_response
+from main import Q
+from utils.ntt import convert_to_ntt_batch
+
+_a_ntt = None  # set in every worker by _init_worker
+
+
+def _init_worker(a):
+    global _a_ntt
+    _a_ntt = convert_to_ntt_batch(np.array([a]), Q)[0]
+
+
+def _server_response(task):
+    vs, pi = task
+    vs_ntt = convert_to_ntt_batch(np.array([vs]), Q)[0]
+    return server_response(_a_ntt, vs, vs_ntt, pi)
+
+
+# Pending handshakes are (verifier, pi) pairs. Results are (pj, wj, skj) in submission order.
+class BatchEngine:
+    def __init__(self, a, workers=None, chunksize=1):
+        self.chunksize = chunksize
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(list(a),))
+
+    def respond(self, pending, chunksize=None):
+        chunksize = self.chunksize if chunksize is None else chunksize
+        return list(self._executor.map(_server_response, pending, chunksize=chunksize))
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
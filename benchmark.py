@@ -0,0 +1,192 @@
+# Benchmarks of protocol phases and underlying primitives with warmup, repetitions and statistical summary.
+# Results can be written as JSON and compared with a saved baseline, regression is reported when median time
+# grows by more than threshold (exit code 1).
+#
+# python benchmark.py --output baseline.json
+# python benchmark.py --baseline baseline.json --threshold 0.1
+# python benchmark.py --filter ntt --repeat 50
+# PQSRP_PARAMS=pqsrp-512 python benchmark.py   (other parameter set, see utils/params.py)
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+from secrets import token_bytes
+
+import numpy as np
+
+from main import N, Q, ETA, UNIFORM_SEED_BYTES, NOISE_SEED_BYTES, I, REALM, PARAMS, phase_0, phase_1, phase_2
+from utils.encoding import encode_fixed, decode_fixed, encode_packed, decode_packed
+from utils.kyber import create_one_cbd_poly, create_many_cbd_polys, create_one_uniform_poly
+from utils.magic import signal_function_poly, robust_extractor_poly, sigma_to_bytes
+from utils.ntt import convert_to_ntt, convert_from_ntt, convert_to_ntt_batch, convert_from_ntt_batch
+from utils.ntt_cache import NTTCache
+from utils.polynomial import mul_simple, mul_ntt, generate_modulo_polynomial, poly_to_bytes
+
+
+# Returns {name: function without arguments}. Inputs are prepared here, so they are not part of measured time.
+def bench_cases():
+    a = create_one_uniform_poly(N, Q, seed_bytes=UNIFORM_SEED_BYTES)
+    v = phase_0(a)
+    cache = NTTCache(Q)
+    _, v_ntt = cache.register_verifier(I, v)
+    _, a_ntt_cached = cache.public(REALM, a)
+    pi, pj, ski, skj = phase_1(a, v)
+    s = create_one_cbd_poly(N, ETA, token_bytes(NOISE_SEED_BYTES), Q)
+    modulo_polynomial = generate_modulo_polynomial(N)
+    a_ntt = convert_to_ntt([x % Q for x in a], Q)
+    batch = np.array([a] * 8)
+    batch_ntt = convert_to_ntt_batch(batch, Q)
+    seeds = [token_bytes(NOISE_SEED_BYTES) for _ in range(8)]
+    wj = signal_function_poly(pi, Q)
+    fixed = encode_fixed(pi)
+    packed = encode_packed(pi)
+
+    def quiet_phase_2():
+        with contextlib.redirect_stdout(io.StringIO()):
+            phase_2(pi, pj, ski, skj)
+
+    def reconciliation():
+        w = signal_function_poly(pi, Q)
+        return sigma_to_bytes(robust_extractor_poly(pi, w, Q))
+
+    return {
+        "phase_0": lambda: phase_0(a),
+        "phase_1": lambda: phase_1(a, v),
+        "phase_1_cached": lambda: phase_1(a, v, a_ntt_cached, v_ntt),
+        "phase_2": quiet_phase_2,
+        "mul_simple": lambda: mul_simple(a, s, modulo_polynomial, Q),
+        "mul_ntt": lambda: mul_ntt(a, s, Q),
+        "ntt_forward": lambda: convert_to_ntt(a, Q),
+        "ntt_inverse": lambda: convert_from_ntt(a_ntt, Q),
+        "ntt_forward_batch8": lambda: convert_to_ntt_batch(batch, Q),
+        "ntt_inverse_batch8": lambda: convert_from_ntt_batch(batch_ntt, Q),
+        "cbd_sampling": lambda: create_one_cbd_poly(N, ETA, seeds[0], Q),
+        "cbd_sampling_batch8": lambda: create_many_cbd_polys(N, ETA, seeds, Q),
+        "uniform_sampling": lambda: create_one_uniform_poly(N, Q, seed_bytes=UNIFORM_SEED_BYTES),
+        "reconciliation": reconciliation,
+        "robust_extractor": lambda: robust_extractor_poly(pi, wj, Q),
+        "poly_to_bytes": lambda: poly_to_bytes(pi + pj),
+        "encode_fixed": lambda: encode_fixed(pi),
+        "decode_fixed": lambda: decode_fixed(fixed),
+        "encode_packed": lambda: encode_packed(pi),
+        "decode_packed": lambda: decode_packed(packed, N),
+    }
+
+
+def run_case(function, warmup, repeat):
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(times):
+    return {
+        "repeat": len(times),
+        "min": min(times),
+        "max": max(times),
+        "mean": statistics.mean(times),
+        "median": statistics.median(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def run(names=None, warmup=2, repeat=10):
+    cases = bench_cases()
+    results = {}
+    for name, function in cases.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        results[name] = summarize(run_case(function, warmup, repeat))
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "params": PARAMS.name,
+            "n": N,
+            "q": Q,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+COMPARED_META = ("params", "n", "q")  # timings of different parameter sets are not comparable
+
+
+def check_comparable(current, baseline):
+    for key in COMPARED_META:
+        if current["meta"].get(key) != baseline.get("meta", {}).get(key):
+            raise ValueError(f"baseline was recorded with {key} = {baseline.get('meta', {}).get(key)}, "
+                             f"current run uses {current['meta'].get(key)}")
+
+
+# Returns [(name, baseline median, current median, ratio)] of cases slower than baseline by more than threshold.
+# Cases missing in baseline are skipped, ValueError if baseline was recorded with other parameters.
+def compare(current, baseline, threshold):
+    check_comparable(current, baseline)
+    regressions = []
+    for name, summary in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        old = baseline["results"][name]["median"]
+        new = summary["median"]
+        if new > old * (1 + threshold):
+            regressions.append((name, old, new, new / old))
+    return regressions
+
+
+def print_results(current, baseline=None):
+    print(f"{'case':<22}{'median ms':>12}{'mean ms':>12}{'stdev ms':>12}{'min ms':>12}{'baseline':>12}")
+    for name, summary in current["results"].items():
+        base = ""
+        if baseline is not None and name in baseline["results"]:
+            base = f"{summary['median'] / baseline['results'][name]['median']:.2f}x"
+        print(f"{name:<22}{summary['median'] * 1000:>12.3f}{summary['mean'] * 1000:>12.3f}"
+              f"{summary['stdev'] * 1000:>12.3f}{summary['min'] * 1000:>12.3f}{base:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of P-Q SRP phases and primitives.")
+    parser.add_argument("--filter", nargs="*", help="run only cases whose name contains one of these strings")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative growth of median time")
+    args = parser.parse_args()
+    assert args.repeat > 0
+
+    current = run(args.filter, args.warmup, args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            check_comparable(current, baseline)
+        except ValueError as e:
+            sys.exit(f"cannot compare with {args.baseline}: {e}")
+    print_results(current, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if baseline is not None:
+        regressions = compare(current, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {old * 1000:.3f} ms -> {new * 1000:.3f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+# Client and server sides of the protocol from main.py as separate state machines.
+# Every step takes the received message and returns the message to be sent, so the endpoints can be driven
+# by any transport (see transport.py). Messages are encoded by the functions at the end of this module.
+#
+# Phase 0: client -> server   REGISTER(I, v)
+# Phase 1: client -> server   LOGIN(I, pi)
+#          server -> client   CHALLENGE(pj, wj)
+# Phase 2: client -> server   CONFIRM(M1)
+#          server -> client   ACCEPT(M2) or REJECT
+
+
+import hmac
+from functools import partial
+
+import numpy as np
+from secrets import token_bytes
+
+from ephemeral_pool import EphemeralPool
+from main import N, Q, ETA, NOISE_SEED_BYTES, REALM, create_seeds
+from utils.encoding import encode_fixed, decode_fixed
+from utils.hashing import sha3_256, shake128
+from utils.infinity_norm import symmetric_mod_array
+from utils.instrumentation import phase
+from utils.kyber import create_one_cbd_poly, create_many_cbd_polys
+from utils.magic import signal_function_poly, robust_extractor_poly, sigma_to_bytes
+from utils.ntt import convert_to_ntt_batch, multiply_ntt_polys_batch, convert_from_ntt_batch
+from utils.ntt_cache import NTTCache
+from utils.polynomial import add, sub, mul, mul_ntt_pretransformed, generate_modulo_polynomial, \
+    generate_constant_polynomial, poly_to_bytes
+
+
+# CLIENT: v = asv + 2ev
+def client_verifier(a, identity, pwd, salt):
+    modulo_polynomial = generate_modulo_polynomial(N)
+    seed1, seed2 = create_seeds(identity, pwd, salt)
+    sv = create_one_cbd_poly(N, ETA, seed1, Q)
+    ev = create_one_cbd_poly(N, ETA, seed2, Q)
+    a_sv = mul(a, sv, modulo_polynomial, Q)
+    two_ev = mul(generate_constant_polynomial(2, N), ev, modulo_polynomial, Q)
+    return add(a_sv, two_ev, Q), sv
+
+
+# CLIENT: pi = as1 + 2e1
+def client_start(a):
+    modulo_polynomial = generate_modulo_polynomial(N)
+    s1 = create_one_cbd_poly(N, ETA, token_bytes(NOISE_SEED_BYTES), Q)
+    e1 = create_one_cbd_poly(N, ETA, token_bytes(NOISE_SEED_BYTES), Q)
+    a_s1 = mul(a, s1, modulo_polynomial, Q)
+    two_e1 = mul(generate_constant_polynomial(2, N), e1, modulo_polynomial, Q)
+    return add(a_s1, two_e1, Q), s1
+
+
+# CLIENT: ki = (pj − v)(sv + s1) + uv + 2e1'', ski = SHA3-256(Mod_2(ki, wj))
+def client_key(a, identity, pwd, salt, s1, pi, pj, wj):
+    modulo_polynomial = generate_modulo_polynomial(N)
+    uc = shake128(sha3_256(poly_to_bytes(pi + pj)), N)
+    vc, sv = client_verifier(a, identity, pwd, salt)
+    e1_doubleprime = create_one_cbd_poly(N, ETA, token_bytes(NOISE_SEED_BYTES), Q)
+    fst_bracket = sub(pj, vc, Q)
+    snd_bracket = add(sv, s1, Q)
+    fst_multi = mul(fst_bracket, snd_bracket, modulo_polynomial, Q)
+    snd_multi = mul(uc, vc, modulo_polynomial, Q)
+    trd_multi = mul(generate_constant_polynomial(2, N), e1_doubleprime, modulo_polynomial, Q)
+    ki = add(add(fst_multi, snd_multi, Q), trd_multi, Q)
+    sigmai = robust_extractor_poly(ki, wj, Q)
+    return sha3_256(sigma_to_bytes(sigmai))
+
+
+# SERVER: s1', as1' + 2e1' and 2e1''' do not depend on client's message, so they can be computed before the login
+# arrives (see ephemeral_pool.py). s1' is kept only in NTT domain. Share is used for exactly one login and wiped.
+class EphemeralShare:
+    __slots__ = ("s1_prime_ntt", "a_s1prime_two_e1prime", "two_e1tripleprime")
+
+    def __init__(self, s1_prime_ntt, a_s1prime_two_e1prime, two_e1tripleprime):
+        self.s1_prime_ntt = s1_prime_ntt
+        self.a_s1prime_two_e1prime = a_s1prime_two_e1prime
+        self.two_e1tripleprime = two_e1tripleprime
+
+    # Overwrites secrets with zeros in place.
+    def wipe(self):
+        self.s1_prime_ntt.fill(0)
+        self.a_s1prime_two_e1prime.fill(0)
+        self.two_e1tripleprime.fill(0)
+
+
+# All intermediate arrays are zeroed before returning; only the share keeps secrets.
+def server_ephemeral(a_ntt):
+    noise = create_many_cbd_polys(N, ETA, [token_bytes(NOISE_SEED_BYTES) for _ in range(3)], Q)  # s1', e1', e1'''
+    s1_prime_ntt = convert_to_ntt_batch(noise[:1], Q)
+    a_s1prime_ntt = multiply_ntt_polys_batch(a_ntt, s1_prime_ntt, Q)
+    a_s1prime = convert_from_ntt_batch(a_s1prime_ntt, Q)
+    a_s1prime_two_e1prime = 2 * noise[1]
+    a_s1prime_two_e1prime += a_s1prime[0]
+    share = EphemeralShare(s1_prime_ntt[0], symmetric_mod_array(a_s1prime_two_e1prime, Q), 2 * noise[2])
+    for temporary in (noise, a_s1prime_ntt, a_s1prime, a_s1prime_two_e1prime):
+        temporary.fill(0)
+    return share
+
+
+# SERVER: pj = as1' + 2e1' + v, kj = (v + pi)s1' + uv + 2e1''', wj = Cha(kj), skj = SHA3-256(Mod_2(kj, wj))
+# a and vs are also passed in NTT domain (a_ntt, vs_ntt). Ephemeral share is created now unless one is passed.
+def server_response(a_ntt, vs, vs_ntt, pi, share=None):
+    share = server_ephemeral(a_ntt) if share is None else share
+    pj = add(share.a_s1prime_two_e1prime.tolist(), vs, Q)
+    us = shake128(sha3_256(poly_to_bytes(pi + pj)), N)
+    fst_multi = mul_ntt_pretransformed(share.s1_prime_ntt, add(vs, pi, Q), Q)
+    snd_multi = mul_ntt_pretransformed(vs_ntt, us, Q)
+    kj = add(add(fst_multi, snd_multi, Q), share.two_e1tripleprime.tolist(), Q)
+    share.wipe()
+    wj = signal_function_poly(kj, Q)
+    sigmaj = robust_extractor_poly(kj, wj, Q)
+    return pj, wj, sha3_256(sigma_to_bytes(sigmaj))
+
+
+# M1 = SHA3-256(pi || pj || sk)
+def confirmation_m1(pi, pj, sk):
+    return sha3_256(poly_to_bytes(pi + pj) + sk)
+
+
+# M2 = SHA3-256(pi || M1 || sk)
+def confirmation_m2(pi, m1, sk):
+    return sha3_256(poly_to_bytes(pi) + m1 + sk)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+# Client side. States: "init" -> "started" -> "confirming" -> "done" (or "failed").
+class Client:
+    def __init__(self, a, identity, pwd, salt):
+        self.a = a
+        self.identity = identity
+        self.pwd = pwd
+        self.salt = salt
+        self.state = "init"
+        self.key = None
+        self._s1 = self._pi = self._m1 = None
+
+    def _expect(self, state):
+        if self.state != state:
+            raise ProtocolError(f"client is in state {self.state}, expected {state}")
+
+    # Phase 0, returns REGISTER message. Does not change the state.
+    def registration(self):
+        with phase("phase_0"):
+            v, _ = client_verifier(self.a, self.identity, self.pwd, self.salt)
+        return encode_register(self.identity, v)
+
+    # Phase 1, returns LOGIN message.
+    def start(self):
+        self._expect("init")
+        with phase("phase_1"):
+            self._pi, self._s1 = client_start(self.a)
+        self.state = "started"
+        return encode_login(self.identity, self._pi)
+
+    # Phase 1 and 2, takes CHALLENGE message and returns CONFIRM message.
+    def challenge(self, message):
+        self._expect("started")
+        pj, wj = decode_challenge(message)
+        with phase("phase_1"):
+            self.key = client_key(self.a, self.identity, self.pwd, self.salt, self._s1, self._pi, pj, wj)
+        self._s1 = None
+        with phase("phase_2"):
+            self._m1 = confirmation_m1(self._pi, pj, self.key)
+        self.state = "confirming"
+        return encode_confirm(self._m1)
+
+    # Phase 2, takes ACCEPT message. Returns True if the server is authenticated.
+    def accept(self, message):
+        self._expect("confirming")
+        m2 = decode_accept(message)
+        with phase("phase_2"):
+            expected_m2 = confirmation_m2(self._pi, self._m1, self.key)
+        if not hmac.compare_digest(m2, expected_m2):
+            self.state = "failed"
+            self.key = None
+            return False
+        self.state = "done"
+        return True
+
+
+# Server holding registered verifiers (and their NTT forms in cache). Sessions are created per login.
+# If pool_size > 0, ephemeral shares are precomputed in background (see ephemeral_pool.py), call close() at the end.
+# Verifiers are kept in a dict unless another mapping in normal form is passed (e.g. utils.verifier_store).
+class Server:
+    def __init__(self, a, cache_size=1024, pool_size=0, verifiers=None):
+        if getattr(verifiers, "ntt", False):
+            raise ValueError("verifiers must be stored in normal form")
+        self.a = a
+        self.verifiers = {} if verifiers is None else verifiers
+        self.cache = NTTCache(Q, cache_size)
+        a_ntt = self.cache.public(REALM, a)[1]
+        self.pool = EphemeralPool(partial(server_ephemeral, a_ntt), pool_size) if pool_size > 0 else None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+    # Phase 0, takes REGISTER message.
+    def register(self, message):
+        identity, v = decode_register(message)
+        try:
+            self.verifiers[identity] = v
+        except ValueError as e:  # rejected by the mapping, e.g. identity too long for utils.verifier_store
+            raise ProtocolError(str(e)) from e
+        self.cache.register_verifier(identity, v)
+        return identity
+
+    def verifier(self, identity):
+        if identity not in self.verifiers:
+            raise ProtocolError(f"unknown identity {identity}")
+        return self.cache.verifier(identity, self.verifiers[identity])
+
+    def session(self):
+        return ServerSession(self)
+
+
+# Server side of one login. States: "init" -> "challenged" -> "done" (or "failed").
+class ServerSession:
+    def __init__(self, server):
+        self.server = server
+        self.state = "init"
+        self.identity = None
+        self.key = None
+        self._pi = self._pj = None
+
+    def _expect(self, state):
+        if self.state != state:
+            raise ProtocolError(f"server session is in state {self.state}, expected {state}")
+
+    # Phase 1, takes LOGIN message and returns CHALLENGE message.
+    def login(self, message):
+        self._expect("init")
+        self.identity, self._pi = decode_login(message)
+        with phase("phase_1"):  # also cache and pool misses, which transform or sample on the request path
+            vs, vs_ntt = self.server.verifier(self.identity)
+            a_ntt = self.server.cache.public(REALM, self.server.a)[1]
+            share = None if self.server.pool is None else self.server.pool.take()
+            self._pj, wj, self.key = server_response(a_ntt, vs, vs_ntt, self._pi, share)
+        self.state = "challenged"
+        return encode_challenge(self._pj, wj)
+
+    # Phase 2, takes CONFIRM message and returns ACCEPT message, or None if the client is not authenticated.
+    def confirm(self, message):
+        self._expect("challenged")
+        m1 = decode_confirm(message)
+        with phase("phase_2"):
+            if not hmac.compare_digest(m1, confirmation_m1(self._pi, self._pj, self.key)):
+                self.state = "failed"
+                self.key = None
+                return None
+            m2 = confirmation_m2(self._pi, m1, self.key)
+        self.state = "done"
+        return encode_accept(m2)
+
+
+# Encoding of messages. Polynomials use the fixed format of utils.encoding, identity is prefixed by its length.
+
+def _encode_identity(identity):
+    identity = identity.encode()
+    return len(identity).to_bytes(2, "big") + identity
+
+
+def _decode_identity(message):
+    if len(message) < 2:
+        raise ProtocolError("message is too short")
+    length = int.from_bytes(message[:2], "big")
+    if len(message) < 2 + length:
+        raise ProtocolError("identity is longer than message")
+    try:
+        identity = bytes(message[2:2 + length]).decode()
+    except UnicodeDecodeError as e:
+        raise ProtocolError("identity is not valid UTF-8") from e
+    return identity, message[2 + length:]
+
+
+def _decode_poly(buf):
+    if len(buf) != 4 * N:
+        raise ProtocolError(f"polynomial has {len(buf)} bytes, expected {4 * N}")
+    # Copied into a list: polynomials are lists in utils.polynomial (and pi + pj is list concatenation).
+    return decode_fixed(buf).tolist()
+
+
+def encode_register(identity, v):
+    return _encode_identity(identity) + encode_fixed(v)
+
+
+def decode_register(message):
+    identity, rest = _decode_identity(memoryview(message))
+    return identity, _decode_poly(rest)
+
+
+encode_login = encode_register
+decode_login = decode_register
+
+
+def encode_challenge(pj, wj):
+    return encode_fixed(pj) + np.packbits(np.asarray(wj, dtype=np.uint8)).tobytes()
+
+
+def decode_challenge(message):
+    message = memoryview(message)
+    pj = _decode_poly(message[:4 * N])
+    wj = np.unpackbits(np.frombuffer(message[4 * N:], dtype=np.uint8))[:N].astype(np.int64)
+    if len(wj) != N:
+        raise ProtocolError("challenge is too short")
+    return pj, wj
+
+
+def encode_confirm(m1):
+    return bytes(m1)
+
+
+def decode_confirm(message):
+    return bytes(message)
+
+
+encode_accept = encode_confirm
+decode_accept = decode_confirm
@@ -0,0 +1,85 @@
+# Bounded pool of server's ephemeral shares (see endpoints.EphemeralShare) precomputed by a background thread.
+# When the number of ready shares drops below low_water, the pool is refilled up to capacity.
+# Every share is handed out exactly once; it is wiped by the consumer after use (server_response does so)
+# and by the pool on close. If make_share fails in the background thread, the pool stops refilling and the error
+# is re-raised by take(), wait_ready() and close().
+
+import threading
+from collections import deque
+
+
+class EphemeralPool:
+    def __init__(self, make_share, capacity=64, low_water=None):
+        low_water = max(capacity // 4, 1) if low_water is None else low_water
+        assert 0 < low_water <= capacity
+        self.make_share = make_share
+        self.capacity = capacity
+        self.low_water = low_water
+        self.misses = 0  # shares created on request path because the pool was empty
+        self._shares = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._refill, name="ephemeral-pool", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._shares)
+
+    def _refill(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or len(self._shares) < self.low_water)
+                if self._closed:
+                    return
+            while True:
+                try:
+                    share = self.make_share()  # outside of the lock, so take() is not blocked meanwhile
+                except Exception as e:
+                    with self._condition:
+                        self._error = e
+                        self._condition.notify_all()
+                    return
+                with self._condition:
+                    if self._closed:
+                        share.wipe()
+                        return
+                    self._shares.append(share)
+                    self._condition.notify_all()
+                    if len(self._shares) >= self.capacity:
+                        break
+
+    # Returns a share which is removed from the pool. If the pool is empty, the share is created right away.
+    def take(self):
+        with self._condition:
+            self._raise_error()
+            share = self._shares.popleft() if self._shares else None
+            if share is None:
+                self.misses += 1
+            if len(self._shares) < self.low_water:
+                self._condition.notify_all()
+        if share is None:
+            share = self.make_share()
+        return share
+
+    # Blocks until at least `count` shares are ready (e.g. to warm the pool up before serving).
+    def wait_ready(self, count=None, timeout=None):
+        count = self.capacity if count is None else min(count, self.capacity)
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self._closed or self._error is not None or len(self._shares) >= count, timeout)
+            self._raise_error()
+            return ready
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("ephemeral pool stopped refilling") from self._error
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        while self._shares:
+            self._shares.popleft().wipe()
+        self._raise_error()
@@ -0,0 +1,104 @@
+# Load generator for transport.py: N concurrent clients run handshakes (phases 1 and 2) against one server
+# and handshakes per second together with p50/p99 latency are reported.
+#
+# python loadgen.py bench --clients 16 --handshakes 10            (server in the same process)
+# python loadgen.py serve --port 9000                              (standalone server)
+# python loadgen.py bench --clients 16 --handshakes 10 --port 9000 (against the standalone server)
+
+import argparse
+import asyncio
+import time
+from math import ceil
+
+from Crypto.Hash import SHA3_256
+
+from endpoints import Client, Server
+from main import N, Q, UNIFORM_SEED_BYTES, REALM, PWD, SALT
+from transport import start_server, open_connection, register, login
+from utils.kyber import create_one_uniform_poly
+from utils.verifier_store import VerifierStore
+
+
+# Public polynomial a of a realm. Both sides derive it from the realm name, so separate processes agree on it.
+def public_polynomial(realm=REALM):
+    seed = SHA3_256.new(realm.encode()).digest().ljust(UNIFORM_SEED_BYTES, b"\0")
+    return create_one_uniform_poly(N, Q, seed)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[max(ceil(p / 100 * len(sorted_values)) - 1, 0)]
+
+
+async def run_client(a, identity, handshakes, host, port, path, latencies):
+    reader, writer = await open_connection(host, port, path)
+    try:
+        await register(reader, writer, Client(a, identity, PWD, SALT))
+        for _ in range(handshakes):
+            start = time.perf_counter()
+            await login(reader, writer, Client(a, identity, PWD, SALT))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def bench(clients, handshakes, host="127.0.0.1", port=None, path=None, pool_size=0):
+    a = public_polynomial()
+    server = endpoint = None
+    if port is None and path is None:
+        endpoint = Server(a, pool_size=pool_size)
+        server = await start_server(endpoint, host)
+        port = server.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(run_client(a, f"identity{i}", handshakes, host, port, path, latencies)
+                               for i in range(clients)))
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            endpoint.close()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "handshakes": len(latencies),
+        "seconds": elapsed,
+        "handshakes_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def serve(host="127.0.0.1", port=None, path=None, pool_size=0, store=None):
+    verifiers = None if store is None else VerifierStore(store, N)
+    endpoint = Server(public_polynomial(), pool_size=pool_size, verifiers=verifiers)
+    server = await start_server(endpoint, host, port, path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        endpoint.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for P-Q SRP handshakes over asyncio transport.")
+    parser.add_argument("command", choices=("bench", "serve"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--unix", help="path of Unix socket, used instead of TCP")
+    parser.add_argument("--clients", type=int, default=8, help="number of concurrent clients")
+    parser.add_argument("--handshakes", type=int, default=10, help="handshakes per client")
+    parser.add_argument("--store", help="path of memory-mapped verifier store used by serve")
+    parser.add_argument("--pool", type=int, default=0, help="size of server's pool of precomputed ephemeral shares")
+    args = parser.parse_args()
+    if args.command == "serve":
+        asyncio.run(serve(args.host, args.port, args.unix, args.pool, args.store))
+        return
+    result = asyncio.run(bench(args.clients, args.handshakes, args.host, args.port, args.unix, args.pool))
+    print(f"{result['handshakes']} handshakes in {result['seconds']:.2f} s: "
+          f"{result['handshakes_per_second']:.1f} handshakes/s, "
+          f"p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
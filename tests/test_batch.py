@@ -0,0 +1,20 @@
+from batch import BatchEngine
+from endpoints import client_verifier, client_start, client_key
+from utils.kyber import create_one_uniform_poly
+from main import N, Q
+
+A = create_one_uniform_poly(N, Q, bytes(33))
+
+
+def test_results_match_client_keys_in_submission_order():
+    logins = []
+    for k in range(4):
+        identity, pwd, salt = f"user{k}", f"pwd{k}", b"salt"
+        vs, _ = client_verifier(A, identity, pwd, salt)
+        pi, s1 = client_start(A)
+        logins.append((identity, pwd, salt, vs, pi, s1))
+    with BatchEngine(A, workers=2) as engine:
+        results = engine.respond([(vs, pi) for _, _, _, vs, pi, _ in logins])
+    assert len(results) == len(logins)
+    for (identity, pwd, salt, vs, pi, s1), (pj, wj, skj) in zip(logins, results):
+        assert client_key(A, identity, pwd, salt, s1, pi, pj, wj) == skj
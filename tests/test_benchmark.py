@@ -0,0 +1,25 @@
+import pytest
+
+from benchmark import compare
+
+
+def results(params="pqsrp-1024", **medians):
+    return {"meta": {"params": params, "n": 1024, "q": 1073479681},
+            "results": {name: {"median": median} for name, median in medians.items()}}
+
+
+def test_regression_threshold_boundary():
+    baseline = results(phase_1=1.0, phase_2=1.0)
+    assert compare(results(phase_1=1.5, phase_2=0.5), baseline, 0.5) == []  # exactly at threshold
+    assert compare(results(phase_1=1.75, phase_2=1.5), baseline, 0.5) == [("phase_1", 1.0, 1.75, 1.75)]
+
+
+def test_cases_missing_in_baseline_are_skipped():
+    assert compare(results(phase_1=5.0, new_case=5.0), results(phase_1=5.0), 0.10) == []
+
+
+def test_baseline_with_other_parameters_is_refused():
+    current = results("pqsrp-512", phase_1=1.0)
+    current["meta"]["n"] = 512
+    with pytest.raises(ValueError):
+        compare(current, results(phase_1=2.0), 0.10)
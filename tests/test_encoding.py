@@ -0,0 +1,53 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.encoding import encode_fixed, decode_fixed, encode_packed, decode_packed, packed_length
+from utils.polynomial import poly_to_bytes
+
+Q = 1073479681
+HALF = (Q - 1) // 2
+
+
+def random_poly():
+    return [random.randint(-HALF, HALF) for _ in range(1024)] + [HALF, -HALF, 0, -1]
+
+
+def test_poly_to_bytes_matches_int_to_bytes():
+    p = random_poly()
+    assert poly_to_bytes(p) == b"".join(x.to_bytes(4, "big", signed=True) for x in p)
+
+
+def test_fixed_round_trip_is_zero_copy():
+    p = random_poly()
+    encoded = encode_fixed(p)
+    assert encoded == b"".join(x.to_bytes(4, "little", signed=True) for x in p)
+    decoded = decode_fixed(memoryview(encoded))
+    assert decoded.tolist() == p
+    assert decoded.base is not None
+
+
+@pytest.mark.parametrize("bits", [30, 31, 32])
+def test_packed_round_trip(bits):
+    p = random_poly()
+    encoded = encode_packed(p, bits)
+    assert len(encoded) == packed_length(len(p), bits)
+    assert decode_packed(memoryview(encoded), len(p), bits).tolist() == p
+
+
+@pytest.mark.parametrize("p", [[2 ** 31], [-2 ** 31 - 1], np.array([0x80000063ff]), [2 ** 70]])
+def test_out_of_range_coefficients_are_rejected(p):
+    with pytest.raises(OverflowError):
+        poly_to_bytes(p)
+    with pytest.raises(OverflowError):
+        encode_fixed(p)
+
+
+@pytest.mark.parametrize("bits", [30, 31, 32])
+def test_packed_out_of_range_coefficients_are_rejected(bits):
+    with pytest.raises(OverflowError):
+        encode_packed([0, 2 ** (bits - 1)], bits)
+    with pytest.raises(OverflowError):
+        encode_packed([-2 ** (bits - 1) - 1], bits)
+    assert decode_packed(encode_packed([-2 ** (bits - 1)], bits), 1, bits).tolist() == [-2 ** (bits - 1)]
@@ -0,0 +1,43 @@
+from hashlib import sha3_256
+
+import pytest
+
+from endpoints import Client, Server, ProtocolError, decode_register, encode_register
+from utils.kyber import create_one_uniform_poly
+from main import N, Q, create_seeds
+
+A = create_one_uniform_poly(N, Q, bytes(33))
+
+
+def handshake(server, client):
+    session = server.session()
+    accept = session.confirm(client.challenge(session.login(client.start())))
+    return session, accept
+
+
+def test_handshake_agrees_on_key():
+    server = Server(A)
+    server.register(Client(A, "alice", "pwd", b"salt").registration())
+    client = Client(A, "alice", "pwd", b"salt")
+    session, accept = handshake(server, client)
+    assert accept is not None and client.accept(accept)
+    assert client.key == session.key
+
+
+def test_wrong_password_is_rejected():
+    server = Server(A)
+    server.register(Client(A, "alice", "pwd", b"salt").registration())
+    session, accept = handshake(server, Client(A, "alice", "bad", b"salt"))
+    assert accept is None and session.state == "failed"
+
+
+@pytest.mark.parametrize("message", [b"", b"\x00", b"\x00\x05ab", b"\x00\x02\xff\xfe" + bytes(4 * N),
+                                     encode_register("alice", [0] * N)[:-1]])
+def test_malformed_register_raises_protocol_error(message):
+    with pytest.raises(ProtocolError):
+        decode_register(message)
+
+
+def test_create_seeds():
+    seed1 = sha3_256(b"salt" + sha3_256(b"alicepwd").digest()).digest()
+    assert create_seeds("alice", "pwd", b"salt") == (seed1, sha3_256(seed1).digest())
@@ -0,0 +1,82 @@
+import itertools
+import threading
+
+import pytest
+
+from ephemeral_pool import EphemeralPool
+
+
+class FakeShare:
+    def __init__(self, number):
+        self.number = number
+        self.wiped = False
+
+    def wipe(self):
+        self.wiped = True
+
+
+def share_factory():
+    created = []
+    counter = itertools.count()
+
+    def make_share():
+        share = FakeShare(next(counter))
+        created.append(share)
+        return share
+    return make_share, created
+
+
+def test_each_share_is_handed_out_once():
+    make_share, _ = share_factory()
+    pool = EphemeralPool(make_share, capacity=8)
+    pool.wait_ready()
+    taken = [pool.take().number for _ in range(30)]
+    pool.close()
+    assert len(set(taken)) == len(taken)
+
+
+def test_pool_refills_below_low_water():
+    make_share, _ = share_factory()
+    pool = EphemeralPool(make_share, capacity=8, low_water=4)
+    assert pool.wait_ready(timeout=5)
+    for _ in range(5):
+        pool.take()
+    assert pool.wait_ready(timeout=5) and len(pool) == 8
+    pool.close()
+
+
+def test_miss_is_counted_on_empty_pool():
+    make_share, _ = share_factory()
+    release = threading.Event()
+
+    def slow_make_share():
+        if threading.current_thread().name == "ephemeral-pool":
+            release.wait()
+        return make_share()
+    pool = EphemeralPool(slow_make_share, capacity=4)
+    assert isinstance(pool.take(), FakeShare)
+    assert pool.misses == 1
+    release.set()
+    pool.close()
+
+
+def test_remaining_shares_are_wiped_on_close():
+    make_share, created = share_factory()
+    pool = EphemeralPool(make_share, capacity=8)
+    pool.wait_ready()
+    taken = pool.take()
+    pool.close()
+    assert len(pool) == 0
+    assert all(share.wiped for share in created if share is not taken) and not taken.wiped
+
+
+def test_refill_error_is_reraised():
+    def failing_make_share():
+        raise ValueError("no entropy")
+    pool = EphemeralPool(failing_make_share, capacity=4)
+    with pytest.raises(RuntimeError):
+        pool.wait_ready(timeout=5)
+    with pytest.raises(RuntimeError):
+        pool.take()
+    with pytest.raises(RuntimeError):
+        pool.close()
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from endpoints import Client, Server
+from main import N, Q
+from utils import instrumentation
+from utils.kyber import create_one_uniform_poly
+from utils.instrumentation import instrument, phase, arg_size, snapshot, snapshot_json
+
+
+@instrument("echo", arg_size(0))
+def echo(data):
+    return data
+
+
+@pytest.fixture
+def stats():
+    was_enabled = instrumentation.enabled
+    instrumentation.reset()
+    yield
+    instrumentation.enabled = was_enabled
+    instrumentation.reset()
+
+
+def test_nothing_is_recorded_when_disabled(stats):
+    instrumentation.disable()
+    with phase("phase_1"):
+        assert echo(b"abc") == b"abc"
+    assert snapshot() == {}
+
+
+def test_calls_and_bytes_are_counted_per_phase(stats):
+    instrumentation.enable()
+    echo(b"a")
+    with phase("phase_1"):
+        echo(b"abc")
+        echo(b"de")
+    with phase("phase_2"):
+        echo(b"")
+    result = snapshot()
+    assert set(result) == {"-", "phase_1", "phase_2"}
+    assert result["phase_1"]["echo"]["calls"] == 2 and result["phase_1"]["echo"]["bytes"] == 5
+    assert result["phase_2"]["echo"]["calls"] == 1 and result["-"]["echo"]["bytes"] == 1
+
+
+def test_snapshot_json(stats):
+    instrumentation.enable()
+    with phase("phase_0"):
+        echo(b"abcd")
+    result = json.loads(snapshot_json())
+    echo_stats = result["phase_0"]["echo"]
+    assert set(echo_stats) == {"calls", "total_seconds", "per_call_seconds", "bytes"}
+    assert echo_stats["calls"] == 1 and echo_stats["bytes"] == 4
+    assert echo_stats["per_call_seconds"] == echo_stats["total_seconds"] >= 0
+
+
+def test_server_login_is_recorded_under_phase_1(stats):
+    a = create_one_uniform_poly(N, Q, bytes(33))
+    server = Server(a, cache_size=1)
+    server.register(Client(a, "alice", "pwd", b"salt").registration())
+    server.register(Client(a, "bob", "pwd", b"salt").registration())  # evicts alice from the NTT cache
+    login = Client(a, "alice", "pwd", b"salt").start()
+    instrumentation.enable()
+    instrumentation.reset()
+    server.session().login(login)
+    result = snapshot()
+    assert "-" not in result
+    assert result["phase_1"]["convert_to_ntt_batch"]["calls"] >= 2  # verifier cache miss and s1'
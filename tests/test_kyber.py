@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from Crypto.Hash import SHAKE128
+
+from utils.kyber import prf, bytes_to_bits, create_one_uniform_poly, create_many_uniform_polys, \
+    create_one_cbd_poly, create_many_cbd_polys
+
+Q = 1073479681
+
+
+# Byte-by-byte SampleNTT and bit-by-bit SamplePolyCBD as they were before vectorization.
+
+def reference_sample_ntt(b, q):
+    xof = SHAKE128.new(b)
+    a = []
+    while len(a) < 256:
+        c = xof.read(3)
+        d1 = c[0] + 256*(c[1] % 16)
+        d2 = (c[1] // 16) + 16*c[2]
+        if d1 < q:
+            a.append(d1)
+        if d2 < q and len(a) < 256:
+            a.append(d2)
+    return a
+
+
+def reference_bytes_to_bits(b):
+    return bytearray((x >> j) & 1 for x in b for j in range(8))
+
+
+def reference_cbd_poly(n, eta, seed):
+    result = []
+    for m in range(n // 256):
+        bits = reference_bytes_to_bits(prf(eta, seed, m))
+        for i in range(256):
+            x = sum(bits[2*i*eta:(2*i + 1)*eta])
+            y = sum(bits[(2*i + 1)*eta:(2*i + 2)*eta])
+            result.append(x - y)
+    return result
+
+
+@pytest.mark.parametrize("q", [Q, 3329])
+def test_uniform_poly_is_identical_to_byte_by_byte_sampler(q):
+    seed = os.urandom(33)
+    expected = [x for i in range(4) for x in reference_sample_ntt(seed + bytes([i]), q)]
+    assert create_one_uniform_poly(1024, q, seed) == expected
+
+
+def test_many_uniform_polys_match_single():
+    seeds = [os.urandom(33) for _ in range(3)]
+    polys = create_many_uniform_polys(1024, Q, seeds)
+    assert [p.tolist() for p in polys] == [create_one_uniform_poly(1024, Q, seed) for seed in seeds]
+
+
+def test_bytes_to_bits():
+    b = os.urandom(64)
+    assert bytes_to_bits(b) == reference_bytes_to_bits(b)
+
+
+@pytest.mark.parametrize("eta", [2, 3])
+@pytest.mark.parametrize("n", [256, 512, 1024])
+def test_cbd_poly_is_identical_to_bitwise_sampler(n, eta):
+    seed = os.urandom(32)
+    assert create_one_cbd_poly(n, eta, seed, Q) == reference_cbd_poly(n, eta, seed)
+
+
+@pytest.mark.parametrize("eta", [2, 3])
+def test_many_cbd_polys_match_single(eta):
+    seeds = [os.urandom(32) for _ in range(4)]
+    polys = create_many_cbd_polys(1024, eta, seeds, Q)
+    assert [p.tolist() for p in polys] == [create_one_cbd_poly(1024, eta, seed, Q) for seed in seeds]
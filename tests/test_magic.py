@@ -0,0 +1,31 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.magic import hint_function, robust_extractor, hint_function_poly, robust_extractor_poly, \
+    signal_function_poly, sigma_to_bytes
+
+
+@pytest.mark.parametrize("q", [1073479681, 7681])
+def test_hint_function_poly_matches_scalar(q):
+    quarter = q // 4
+    x = [random.randrange(-q, q) for _ in range(2000)] + [quarter, quarter + 1, quarter + 2, q - quarter - 1,
+                                                         q - quarter, q - quarter + 1, 0]
+    b = [random.randrange(2) for _ in x]
+    assert hint_function_poly(x, np.array(b), q).tolist() == [hint_function(y, c, q) for y, c in zip(x, b)]
+
+
+@pytest.mark.parametrize("q", [1073479681, 7681])
+def test_robust_extractor_poly_matches_scalar(q):
+    x = [random.randrange(-q, q) for _ in range(2000)]
+    w = [random.randrange(2) for _ in x]
+    sigma = robust_extractor_poly(x, w, q)
+    expected = [robust_extractor(y, c, q) for y, c in zip(x, w)]
+    assert sigma.tolist() == expected
+    assert sigma_to_bytes(sigma) == bytes(expected)
+
+
+def test_signal_function_poly_returns_bits():
+    w = signal_function_poly([random.randrange(1073479681) for _ in range(1024)], 1073479681)
+    assert len(w) == 1024 and set(w.tolist()) <= {0, 1}
@@ -0,0 +1,75 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from utils import ntt
+from utils.ntt import convert_to_ntt, convert_from_ntt, multiply_ntt_polys, convert_to_ntt_batch, \
+    convert_from_ntt_batch, multiply_ntt_polys_batch, generate_zetas, get_zetas, ZETAS, ZETAS_INVERTED
+from utils.params import ParamSet
+
+Q = 1073479681
+
+
+def test_generated_zetas_match_tables():
+    assert generate_zetas(1024, Q, 13018541) == (ZETAS, ZETAS_INVERTED)
+
+
+@pytest.mark.parametrize("n", [256, 512, 1024])
+def test_batch_matches_scalar_transforms(n):
+    polys = [[random.randrange(Q) for _ in range(n)] for _ in range(3)]
+    polys_ntt = convert_to_ntt_batch(np.array(polys), Q)
+    for poly, poly_ntt in zip(polys, polys_ntt):
+        assert poly_ntt.tolist() == convert_to_ntt(poly, Q)
+        assert convert_from_ntt_batch(poly_ntt[np.newaxis], Q)[0].tolist() == convert_from_ntt(poly_ntt.tolist(), Q)
+    assert convert_from_ntt_batch(polys_ntt, Q).tolist() == polys
+
+
+def test_batch_pointwise_multiplication_matches_scalar():
+    a = [random.randrange(Q) for _ in range(1024)]
+    b = [random.randrange(Q) for _ in range(1024)]
+    assert multiply_ntt_polys_batch(np.array(a), np.array(b), Q).tolist() == multiply_ntt_polys(a, b, Q)
+
+
+def test_batch_accepts_symmetric_representation():
+    poly = [random.randint(-(Q - 1) // 2, (Q - 1) // 2) for _ in range(1024)]
+    assert convert_to_ntt_batch(np.array([poly]), Q)[0].tolist() == convert_to_ntt([x % Q for x in poly], Q)
+
+
+
+@pytest.mark.parametrize("n, q, eta, seed_bytes", [(1024, 1099511678977, 2, 32), (1000, Q, 2, 32), (1024, Q + 2, 2, 32),
+                                                   (128, Q, 2, 32), (1024, Q, 2, 16)])
+def test_invalid_param_sets_are_rejected(n, q, eta, seed_bytes):
+    with pytest.raises(ValueError):
+        ParamSet("invalid", n, q, eta, noise_seed_bytes=seed_bytes)
+
+
+@pytest.fixture
+def twiddle_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ntt, "twiddle_cache_dir", str(tmp_path))
+    monkeypatch.setattr(ntt, "_zetas_cache", {})
+    return tmp_path
+
+
+def test_twiddle_tables_round_trip_through_disk(twiddle_cache, monkeypatch):
+    expected = generate_zetas(256, Q, ntt.find_psi(256, Q))
+    assert get_zetas(256, Q) == expected
+    assert os.listdir(twiddle_cache) == [f"zetas_256_{Q}.npy"]  # no temporary file is left behind
+    monkeypatch.setattr(ntt, "_zetas_cache", {})
+    monkeypatch.setattr(ntt, "find_psi", None)  # tables must come from disk now
+    assert get_zetas(256, Q) == expected
+
+
+@pytest.mark.parametrize("content", [b"", b"\x93NUMPY", "wrong shape", "wrong values"])
+def test_invalid_twiddle_file_is_regenerated(twiddle_cache, content):
+    path = twiddle_cache / f"zetas_256_{Q}.npy"
+    if content == "wrong shape":
+        np.save(path, np.array(get_zetas(512, Q), dtype=np.int64))
+    elif content == "wrong values":
+        np.save(path, np.ones((2, 255), dtype=np.int64) * 2)
+    else:
+        path.write_bytes(content)
+    expected = generate_zetas(256, Q, ntt.find_psi(256, Q))
+    assert get_zetas(256, Q) == expected
+    assert np.load(path).tolist() == list(expected)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from utils.ntt import convert_to_ntt_batch
+from utils.ntt_cache import NTTCache
+
+Q = 1073479681
+
+
+def test_lru_eviction():
+    cache = NTTCache(Q, maxsize=2)
+    cache.public("realm", [1] * 256)
+    cache.verifier("alice", [2] * 256)
+    cache.public("realm")
+    cache.verifier("bob", [3] * 256)
+    assert ("verifier", "alice") not in cache
+    assert len(cache) == 2
+
+
+def test_register_replaces_verifier():
+    cache = NTTCache(Q)
+    cache.register_verifier("alice", [2] * 256)
+    cache.register_verifier("alice", [4] * 256)
+    v, v_ntt = cache.verifier("alice")
+    assert v == [4] * 256
+    assert v_ntt.tolist() == convert_to_ntt_batch(np.array([v]), Q)[0].tolist()
+
+
+def test_passed_poly_different_from_cached_replaces_entry():
+    cache = NTTCache(Q)
+    cache.verifier("alice", [2] * 256)
+    v, v_ntt = cache.verifier("alice", [5] * 256)
+    assert v == [5] * 256
+    assert v_ntt.tolist() == convert_to_ntt_batch(np.array([v]), Q)[0].tolist()
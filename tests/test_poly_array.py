@@ -0,0 +1,54 @@
+import os
+import random
+
+import pytest
+
+from utils.infinity_norm import symmetric_mod
+from utils.poly_array import Poly
+from utils.polynomial import add, sub, inv
+
+Q = 1073479681
+HALF = (Q - 1) // 2
+
+
+def random_poly(n=1024):
+    return [random.randint(-HALF, HALF) for _ in range(n - 4)] + [HALF, -HALF, 0, -1]
+
+
+def test_from_list_to_list_round_trip():
+    p = random_poly()
+    assert Poly.from_list(p, Q).to_list() == p
+    assert Poly.from_list([x + 3 * Q for x in p], Q).to_list() == p
+
+
+def test_from_bytes():
+    u = os.urandom(1024)
+    assert Poly.from_list(u, Q).to_list() == list(u)
+    assert Poly.from_list(u, 7).to_list() == [symmetric_mod(x, 7) for x in u]
+
+
+def test_add_and_sub_match_list_functions():
+    a, b = random_poly(), random_poly()
+    pa, pb = Poly.from_list(a, Q), Poly.from_list(b, Q)
+    assert (pa + pb).to_list() == add(a, b, Q)
+    assert (pa - pb).to_list() == sub(a, b, Q)
+    assert (pa + b).to_list() == (a + pb).to_list() == add(a, b, Q)
+    assert (a - pb).to_list() == sub(a, b, Q)
+
+
+def test_neg_matches_inv():
+    a = random_poly()
+    assert (-Poly.from_list(a, Q)).to_list() == [symmetric_mod(x, Q) for x in inv(a, Q)]
+
+
+@pytest.mark.parametrize("c", [0, 1, 2, -1, Q - 1, HALF, Q + 5])
+def test_scalar_mul(c):
+    a = random_poly()
+    expected = [symmetric_mod(c * x, Q) for x in a]
+    assert (Poly.from_list(a, Q) * c).to_list() == expected
+    assert (c * Poly.from_list(a, Q)).to_list() == expected
+
+
+def test_canonical():
+    a = random_poly()
+    assert Poly.from_list(a, Q).canonical().tolist() == [x % Q for x in a]
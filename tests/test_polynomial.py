@@ -0,0 +1,52 @@
+import os
+import random
+
+import pytest
+
+from utils.polynomial import mul, mul_simple, mul_ntt, generate_modulo_polynomial
+
+Q = 1073479681
+
+
+def random_symmetric_poly(n, q):
+    return [random.randint(-(q - 1) // 2, (q - 1) // 2) for _ in range(n)]
+
+
+@pytest.mark.parametrize("n", [256, 512, 1024])
+def test_ntt_backend_matches_schoolbook_on_symmetric_operands(n):
+    f = generate_modulo_polynomial(n)
+    a = random_symmetric_poly(n, Q)
+    b = random_symmetric_poly(n, Q)
+    assert mul(a, b, f, Q, backend="ntt") == mul_simple(a, b, f, Q)
+
+
+@pytest.mark.parametrize("n", [256, 512, 1024])
+def test_ntt_backend_matches_schoolbook_on_small_secret(n):
+    f = generate_modulo_polynomial(n)
+    a = random_symmetric_poly(n, Q)
+    s = [random.randint(-2, 2) for _ in range(n)]
+    assert mul(a, s, f, Q, backend="ntt") == mul_simple(a, s, f, Q)
+
+
+@pytest.mark.parametrize("n", [256, 512, 1024])
+def test_ntt_backend_matches_schoolbook_on_xof_bytes(n):
+    f = generate_modulo_polynomial(n)
+    u = os.urandom(n)  # u = XOF(H(pi||pj)) is bytes
+    v = random_symmetric_poly(n, Q)
+    assert mul(u, v, f, Q, backend="ntt") == mul_simple(u, v, f, Q)
+    assert mul_ntt(v, u, Q) == mul_simple(u, v, f, Q)
+
+
+def test_result_is_in_symmetric_representation():
+    n = 1024
+    a = random_symmetric_poly(n, Q)
+    b = random_symmetric_poly(n, Q)
+    assert all(-(Q - 1) // 2 <= x <= (Q - 1) // 2 for x in mul_ntt(a, b, Q))
+
+
+def test_schoolbook_backend_is_selectable():
+    n = 256
+    f = generate_modulo_polynomial(n)
+    a = random_symmetric_poly(n, Q)
+    b = random_symmetric_poly(n, Q)
+    assert mul(a, b, f, Q, backend="schoolbook") == mul_simple(a, b, f, Q)
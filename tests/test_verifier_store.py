@@ -0,0 +1,96 @@
+import os
+import threading
+
+import pytest
+
+from endpoints import Client, Server, ProtocolError
+from utils.kyber import create_one_uniform_poly
+from utils.verifier_store import VerifierStore, HEADER_DTYPE
+from main import N, Q
+
+A = create_one_uniform_poly(N, Q, bytes(33))
+
+
+def verifier(k):
+    return [(k * 7 + i) % 101 - 50 for i in range(N)]
+
+
+def test_reopened_store_finds_newest_records(tmp_path):
+    path = str(tmp_path / "verifiers")
+    store = VerifierStore(path, N)
+    store.register_many([("alice", verifier(1)), ("bob", verifier(2))])
+    store["alice"] = verifier(3)
+    store.close()
+    store = VerifierStore(path, N)
+    assert sorted(store.identities()) == ["alice", "bob"]
+    assert store["alice"].tolist() == verifier(3)
+    assert store["bob"].tolist() == verifier(2)
+
+
+def test_records_of_other_writers_are_found(tmp_path):
+    path = str(tmp_path / "verifiers")
+    reader, writer = VerifierStore(path, N), VerifierStore(path, N)
+    writer["alice"] = verifier(1)
+    assert "alice" in reader
+    assert reader["alice"].tolist() == verifier(1)
+    writer["bob"] = verifier(2)
+    assert reader["bob"].tolist() == verifier(2)
+
+
+def test_incomplete_record_is_ignored_and_overwritten(tmp_path):
+    path = str(tmp_path / "verifiers")
+    store = VerifierStore(path, N)
+    store["alice"] = verifier(1)
+    with open(path, "ab") as f:  # coefficients written, identity not
+        f.write(bytes(4 * N))
+    store = VerifierStore(path, N)
+    assert len(store) == 1
+    store["bob"] = verifier(2)
+    assert os.path.getsize(path) == HEADER_DTYPE.itemsize + 2 * 4 * N
+    assert store["bob"].tolist() == verifier(2)
+
+
+def test_concurrent_registration(tmp_path):
+    store = VerifierStore(str(tmp_path / "verifiers"), N)
+    threads = [threading.Thread(target=store.register, args=(f"user{k}", verifier(k))) for k in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(store[f"user{k}"].tolist() == verifier(k) for k in range(8))
+
+
+def test_invalid_identity_is_not_contained(tmp_path):
+    store = VerifierStore(str(tmp_path / "verifiers"), N)
+    assert "x" * 65 not in store
+    with pytest.raises(ValueError):
+        store["x" * 65] = verifier(1)
+
+
+def test_server_with_store(tmp_path):
+    server = Server(A, verifiers=VerifierStore(str(tmp_path / "verifiers"), N))
+    server.register(Client(A, "alice", "pwd", b"salt").registration())
+    client = Client(A, "alice", "pwd", b"salt")
+    session = server.session()
+    accept = session.confirm(client.challenge(session.login(client.start())))
+    assert accept is not None and client.accept(accept) and client.key == session.key
+    with pytest.raises(ProtocolError):
+        server.register(Client(A, "x" * 65, "pwd", b"salt").registration())
+    with pytest.raises(ProtocolError):
+        server.verifier("x" * 65)
+
+
+def test_server_finds_verifier_registered_through_other_handle(tmp_path):
+    path = str(tmp_path / "verifiers")
+    server = Server(A, verifiers=VerifierStore(path, N))
+    registering_server = Server(A, verifiers=VerifierStore(path, N))
+    registering_server.register(Client(A, "alice", "pwd", b"salt").registration())
+    client = Client(A, "alice", "pwd", b"salt")
+    session = server.session()
+    accept = session.confirm(client.challenge(session.login(client.start())))
+    assert accept is not None and client.accept(accept) and client.key == session.key
+
+
+def test_server_rejects_store_in_ntt_form(tmp_path):
+    with pytest.raises(ValueError):
+        Server(A, verifiers=VerifierStore(str(tmp_path / "verifiers"), N, ntt=True, q=Q))
@@ -0,0 +1,98 @@
+# Asyncio transport for endpoints.py over local TCP or Unix sockets.
+# Frame: 4-byte big-endian length of the rest || 1-byte message type || message.
+# Polynomial work runs in an executor, so the event loop keeps serving other connections meanwhile.
+
+import asyncio
+import struct
+
+from endpoints import ProtocolError
+
+REGISTER, LOGIN, CHALLENGE, CONFIRM, ACCEPT, REJECT, REGISTERED = range(1, 8)
+
+MAX_FRAME_LENGTH = 1 << 16  # largest message (REGISTER) is ~4 KB for N = 1024
+
+
+async def read_frame(reader):
+    length, = struct.unpack(">I", await reader.readexactly(4))
+    if not 1 <= length <= MAX_FRAME_LENGTH:
+        raise ProtocolError(f"invalid frame length {length}")
+    frame = await reader.readexactly(length)
+    return frame[0], memoryview(frame)[1:]
+
+
+def write_frame(writer, message_type, message=b""):
+    writer.write(struct.pack(">IB", len(message) + 1, message_type))
+    writer.write(message)
+
+
+# Serves one connection. A connection may register identities and run any number of logins one after another.
+async def handle_connection(server, reader, writer, executor=None):
+    loop = asyncio.get_running_loop()
+    session = None
+    try:
+        while True:
+            try:
+                message_type, message = await read_frame(reader)
+            except asyncio.IncompleteReadError:
+                break
+            if message_type == REGISTER:
+                await loop.run_in_executor(executor, server.register, message)
+                write_frame(writer, REGISTERED)
+            elif message_type == LOGIN:
+                session = server.session()
+                challenge = await loop.run_in_executor(executor, session.login, message)
+                write_frame(writer, CHALLENGE, challenge)
+            elif message_type == CONFIRM and session is not None:
+                accept = await loop.run_in_executor(executor, session.confirm, message)
+                write_frame(writer, REJECT if accept is None else ACCEPT, accept or b"")
+                session = None
+            else:
+                raise ProtocolError(f"unexpected message type {message_type}")
+            await writer.drain()
+    except ProtocolError:
+        write_frame(writer, REJECT)
+    finally:
+        writer.close()
+
+
+async def start_server(server, host="127.0.0.1", port=0, path=None, executor=None):
+    def handler(reader, writer):
+        return handle_connection(server, reader, writer, executor)
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path=path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def open_connection(host="127.0.0.1", port=None, path=None):
+    if path is not None:
+        return await asyncio.open_unix_connection(path)
+    return await asyncio.open_connection(host, port)
+
+
+async def _expect_frame(reader, expected_type):
+    message_type, message = await read_frame(reader)
+    if message_type != expected_type:
+        raise ProtocolError(f"expected message type {expected_type}, got {message_type}")
+    return message
+
+
+# Phase 0 over an open connection.
+async def register(reader, writer, client, executor=None):
+    loop = asyncio.get_running_loop()
+    write_frame(writer, REGISTER, await loop.run_in_executor(executor, client.registration))
+    await writer.drain()
+    await _expect_frame(reader, REGISTERED)
+
+
+# Phases 1 and 2 over an open connection. Returns the shared key, raises ProtocolError if authentication fails.
+async def login(reader, writer, client, executor=None):
+    loop = asyncio.get_running_loop()
+    write_frame(writer, LOGIN, await loop.run_in_executor(executor, client.start))
+    await writer.drain()
+    challenge = await _expect_frame(reader, CHALLENGE)
+    write_frame(writer, CONFIRM, await loop.run_in_executor(executor, client.challenge, challenge))
+    await writer.drain()
+    accept = await _expect_frame(reader, ACCEPT)
+    if not client.accept(accept):
+        raise ProtocolError("server is not authenticated")
+    return client.key
@@ -0,0 +1,56 @@
+# Wire encodings of polynomials in symmetric representation (coefficients in [-(q-1)/2, (q-1)/2]).
+# Fixed format: 4-byte little-endian signed integer per coefficient, encoded straight from the array buffer.
+# Packed format: every coefficient as `bits`-bit two's complement number, bits of coefficients are concatenated
+#                (little-endian bit order) and padded with zeros to whole bytes. 31 bits are enough for q < 2^31.
+# Decoders take bytes, bytearray or memoryview and return int arrays, fixed format without copying the buffer.
+
+import numpy as np
+
+FIXED_DTYPE = np.dtype("<i4")
+PACKED_BITS = 31
+
+
+# Converts coefficients to 4-byte signed integers, OverflowError (as int.to_bytes) if some of them does not fit.
+def to_fixed_array(p, dtype=FIXED_DTYPE):
+    p = np.asarray(p)
+    if p.dtype.kind not in "iu":
+        p = np.asarray(p, dtype=np.int64)  # OverflowError for Python ints out of int64
+    if p.size and (int(p.min()) < -2 ** 31 or int(p.max()) >= 2 ** 31):
+        raise OverflowError("coefficient does not fit into 4 bytes")
+    return p.astype(dtype, copy=False)
+
+
+def encode_fixed(p):
+    return to_fixed_array(p).tobytes()
+
+
+# Returns read-only (for bytes) view over buf, no coefficient is copied.
+def decode_fixed(buf):
+    return np.frombuffer(buf, dtype=FIXED_DTYPE)
+
+
+def packed_length(n, bits=PACKED_BITS):
+    return (n * bits + 7) // 8
+
+
+def encode_packed(p, bits=PACKED_BITS):
+    p = np.asarray(p, dtype=np.int64)
+    assert 0 < bits <= 32
+    if p.size and (int(p.min()) < -2 ** (bits - 1) or int(p.max()) >= 2 ** (bits - 1)):
+        raise OverflowError(f"coefficient does not fit into {bits} bits")
+    as_unsigned = (p & (2 ** bits - 1)).astype("<u4")
+    coeff_bits = np.unpackbits(as_unsigned.view(np.uint8).reshape(-1, 4), axis=1, bitorder="little")[:, :bits]
+    return np.packbits(coeff_bits.reshape(-1), bitorder="little").tobytes()
+
+
+# n is number of coefficients, by default as many as fit into buf.
+def decode_packed(buf, n=None, bits=PACKED_BITS):
+    assert 0 < bits <= 32
+    all_bits = np.unpackbits(np.frombuffer(buf, dtype=np.uint8), bitorder="little")
+    n = len(all_bits) // bits if n is None else n
+    assert n * bits <= len(all_bits)
+    coeff_bits = np.zeros((n, 32), dtype=np.uint8)
+    coeff_bits[:, :bits] = all_bits[:n * bits].reshape(n, bits)
+    as_unsigned = np.packbits(coeff_bits, axis=1, bitorder="little").view("<u4").reshape(n).astype(np.int64)
+    sign = (as_unsigned >> (bits - 1)) & 1
+    return as_unsigned - (sign << bits)  # sign extension of two's complement
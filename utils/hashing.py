@@ -0,0 +1,15 @@
+# Hash functions used by the protocol, in one place so that they can be instrumented.
+
+from Crypto.Hash import SHAKE128, SHA3_256
+
+from utils.instrumentation import instrument, arg_size
+
+
+@instrument("sha3_256", arg_size(0))
+def sha3_256(data):
+    return SHA3_256.new(data).digest()
+
+
+@instrument("shake128", arg_size(0))
+def shake128(data, length):
+    return SHAKE128.new(data).read(length)
@@ -1,6 +1,16 @@
+import numpy as np
+
+
 # Compute symmetric modulo as defined in https://youtu.be/h5pfTIE6slU?si=-EeOGTV0QD5QzbpY&t=543
 def symmetric_mod(r, q):
     r %= q  # make sure that r is in Z_q
     if q % 2 == 0:  # q is even
-        return r if r <= q / 2 else r - q
-    return r if r <= (q - 1) / 2 else r - q
+        return r if r <= q // 2 else r - q
+    return r if r <= (q - 1) // 2 else r - q
+
+
+# Vectorized symmetric_mod over an integer NumPy array, result is in [-(q-1)/2, (q-1)/2] for odd q.
+def symmetric_mod_array(r, q):
+    r = np.mod(r, q)  # make sure that r is in Z_q
+    r[r > q // 2] -= q  # q // 2 equals q/2 for even q and (q-1)/2 for odd q
+    return r
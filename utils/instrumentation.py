@@ -0,0 +1,116 @@
+# Opt-in instrumentation of primitives: number of calls, cumulative and per-call wall time and bytes processed,
+# grouped by protocol phase. Enabled by enable() or by environment variable PQSRP_INSTRUMENT=1.
+# When disabled, instrumented function costs one extra call and one check of a global flag.
+#
+# with phase("phase_1"):
+#     ...
+# print(snapshot_json())
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+enabled = os.environ.get("PQSRP_INSTRUMENT") == "1"
+
+NO_PHASE = "-"
+_current_phase = ContextVar("phase", default=NO_PHASE)
+_stats = {}  # (phase, name) -> [calls, seconds, bytes]
+_lock = threading.Lock()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+# Calls of instrumented functions inside the block are recorded under the phase name.
+@contextmanager
+def phase(name):
+    token = _current_phase.set(name)
+    try:
+        yield
+    finally:
+        _current_phase.reset(token)
+
+
+def record(name, seconds, nbytes=0):
+    key = (_current_phase.get(), name)
+    with _lock:
+        stat = _stats.get(key)
+        if stat is None:
+            _stats[key] = [1, seconds, nbytes]
+        else:
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] += nbytes
+
+
+# Decorator recording calls of the function under name. size(args, result) returns number of bytes processed.
+def instrument(name, size=None):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return f(*args, **kwargs)
+            start = perf_counter()
+            result = f(*args, **kwargs)
+            elapsed = perf_counter() - start
+            record(name, elapsed, size(args, result) if size is not None else 0)
+            return result
+        return wrapper
+    return decorator
+
+
+# Sizes of processed data for the most common arguments.
+
+def poly_bytes(p):
+    return 4 * len(p)  # coefficients fit into 4 bytes (see utils.encoding)
+
+
+def args_polys_size(*positions):
+    return lambda args, result: sum(poly_bytes(args[i]) for i in positions)
+
+
+def result_polys_size(args, result):
+    return 4 * (result.size if hasattr(result, "size") else len(result))
+
+
+def result_size(args, result):
+    return len(result) if isinstance(result, (bytes, bytearray)) else getattr(result, "nbytes", 0)
+
+
+def arg_size(position):
+    return lambda args, result: len(args[position])
+
+
+# {phase: {name: {"calls", "total_seconds", "per_call_seconds", "bytes"}}}
+def snapshot():
+    with _lock:
+        stats = {key: list(value) for key, value in _stats.items()}
+    result = {}
+    for (phase_name, name), (calls, seconds, nbytes) in sorted(stats.items()):
+        result.setdefault(phase_name, {})[name] = {
+            "calls": calls,
+            "total_seconds": seconds,
+            "per_call_seconds": seconds / calls,
+            "bytes": nbytes,
+        }
+    return result
+
+
+def snapshot_json(indent=2):
+    return json.dumps(snapshot(), indent=indent)
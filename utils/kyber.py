@@ -1,10 +1,13 @@
 # Extracted (and slightly modified) needed functions from https://github.com/mjosaarinen/py-acvp-pqc/blob/main/fips203.py
 
+import numpy as np
 from Crypto.Hash import SHAKE128, SHAKE256
-from utils.infinity_norm import symmetric_mod
 from secrets import token_bytes
 
+from utils.instrumentation import instrument, result_size, result_polys_size
 
+
+@instrument("shake256", result_size)
 def prf(eta, s, b):
     return SHAKE256.new(s + bytes([b])).read(64*eta)
 
@@ -12,59 +15,78 @@ def prf(eta, s, b):
 #   Algorithm 4, BytesToBits(B)
 
 def bytes_to_bits(b):
-    l = len(b)
-    a = bytearray(8*l)
-    for i in range(0, 8*l, 8):
-        x = b[i // 8]
-        for j in range(8):
-            a[i + j] = (x >> j) & 1
-    return a
+    return bytearray(np.unpackbits(np.frombuffer(b, dtype=np.uint8), bitorder="little").tobytes())
 
 
 #   Algorithm 7, SampleNTT(B)
+#   Instead of reading 3 bytes from XOF per candidate pair, whole blocks are squeezed and parsed at once.
+#   XOF output is a stream, so accepted coefficients are exactly the same as in the byte-by-byte version.
 
-def sample_ntt(b, q, a, frm):
+XOF_BLOCK_BYTES = 3 * 168  # 3 SHAKE128 blocks = 336 candidates, enough for 256 coefficients when q > 4095
+
+
+def parse_ntt_candidates(c):
+    c = np.frombuffer(c, dtype=np.uint8).astype(np.int64).reshape(-1, 3)
+    d1 = c[:, 0] + 256*(c[:, 1] % 16)
+    d2 = (c[:, 1] // 16) + 16*c[:, 2]
+    return np.stack((d1, d2), axis=1).reshape(-1)  # keeps order d1, d2, d1, d2, ...
+
+
+@instrument("sample_ntt", result_polys_size)
+def sample_ntt_array(b, q):
     xof = SHAKE128.new(b)
-    j   = 0
-    while j < 256:
-        c   = xof.read(3)
-        d1  = c[0] + 256*(c[1] % 16)
-        d2  = (c[1] // 16) + 16*c[2]
-        if d1 < q:
-            a[frm + j] = d1
-            j += 1
-        if d2 < q and j < 256:
-            a[frm + j] = d2
-            j += 1
+    accepted = np.empty(0, dtype=np.int64)
+    while len(accepted) < 256:
+        d = parse_ntt_candidates(xof.read(XOF_BLOCK_BYTES))
+        accepted = np.concatenate((accepted, d[d < q]))
+    return accepted[:256]
+
+
+def sample_ntt(b, q, a, frm):
+    a[frm:frm + 256] = sample_ntt_array(b, q).tolist()
 
 
 #   Algorithm 8, SamplePolyCBD_eta(B)
+#   Bits of all blocks are unpacked at once and split into (x, y) halves of eta bits by reshaping.
+
+def sample_poly_cbd_array(eta, b):
+    bits = np.unpackbits(np.frombuffer(b, dtype=np.uint8), bitorder="little").reshape(-1, 2, eta)
+    sums = bits.sum(axis=2, dtype=np.int64)
+    return sums[:, 0] - sums[:, 1]  # already in symmetric representation, |x - y| <= eta < q/2
+
 
 def sample_poly_cbd(eta, b, q, f, frm):
-    b = bytes_to_bits(b)
-    for i in range(256):
-        x = sum(b[2*i*eta:(2*i + 1)*eta])
-        y = sum(b[(2*i + 1)*eta:(2*i + 2)*eta])
-        #f[i] = (x - y) % self.q
-        f[frm + i] = symmetric_mod(x - y, q)
+    f[frm:frm + 256] = sample_poly_cbd_array(eta, b).tolist()
     return f
 
 
-def create_one_uniform_poly(n, q):
-    assert n == 1024
-    result = [0] * n
-    seed = token_bytes(33)
-    for i in range(n // 256):
-        sample_ntt(seed + bytes([i]), q, result, i * 256)
+@instrument("create_one_uniform_poly", result_polys_size)
+def create_one_uniform_poly(n, q, seed=None, seed_bytes=33):
+    return create_many_uniform_polys(n, q, [seed], seed_bytes)[0].tolist()
+
+
+# Creates one uniform polynomial for every seed (None = fresh random one of seed_bytes) as rows of 2-D array.
+@instrument("create_many_uniform_polys", result_polys_size)
+def create_many_uniform_polys(n, q, seeds, seed_bytes=33):
+    assert n % 256 == 0
+    result = np.empty((len(seeds), n), dtype=np.int64)
+    for row, seed in zip(result, seeds):
+        seed = token_bytes(seed_bytes) if seed is None else seed
+        for i in range(n // 256):
+            row[i * 256:(i + 1) * 256] = sample_ntt_array(seed + bytes([i]), q)
     return result
 
 
-# We need polynomial of length 1024, so calls sample_poly_cbd more times (as in Kyber).
+# We need polynomial of length n (multiple of 256), so calls sample_poly_cbd more times (as in Kyber).
+@instrument("create_one_cbd_poly", result_polys_size)
 def create_one_cbd_poly(n, eta, seed, q):
-    assert n == 1024
-    result = [0]*n
-    m = 0  # in Kyber it is n in this context.
-    for i in range(n // 256):
-        sample_poly_cbd(eta, prf(eta, seed, m), q, result, i * 256)
-        m += 1
-    return result
\ No newline at end of file
+    return create_many_cbd_polys(n, eta, [seed], q)[0].tolist()
+
+
+# Creates one CBD polynomial for every seed as rows of 2-D array. All PRF outputs are sampled in one pass.
+@instrument("create_many_cbd_polys", result_polys_size)
+def create_many_cbd_polys(n, eta, seeds, q):
+    assert n % 256 == 0
+    assert 2 * eta < q
+    b = b"".join(prf(eta, seed, m) for seed in seeds for m in range(n // 256))  # m is n in Kyber in this context
+    return sample_poly_cbd_array(eta, b).reshape(len(seeds), n)
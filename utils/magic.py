@@ -1,7 +1,9 @@
-from math import floor
-from random import choice
+from secrets import randbits, token_bytes
 
-from utils.infinity_norm import symmetric_mod
+import numpy as np
+
+from utils.infinity_norm import symmetric_mod, symmetric_mod_array
+from utils.instrumentation import instrument, args_polys_size
 
 
 # Implementation of a hint function (sigma_{0,1}(x)) from article A Simple Provably Secure Key Exchange Scheme
@@ -9,22 +11,62 @@ from utils.infinity_norm import symmetric_mod
 def hint_function(x, b, q):
     x %= q  # make sure that x is in Z_q
 
-    l_bound = - floor(q / 4) + b
-    r_bound = floor(q / 4) + b
+    l_bound = - (q // 4) + b
+    r_bound = q // 4 + b
 
     return 1 if r_bound < x < (l_bound % q) else 0
 
 
 # Implementation of a signal function (Cha(y)) from article A Simple Provably Secure Key Exchange Scheme
 # Based on the Learning with Errors Problem.
+@instrument("signal_function")
 def signal_function(y, q):
     y %= q  # make sure that y is in Z_q
-    b = choice([0, 1])
+    b = randbits(1)
     return hint_function(y, b, q)
 
 
 # Implementation of a robust extractor (Mod_2(x, w)) from article A Simple Provably Secure Key Exchange Scheme
 # Based on the Learning with Errors Problem.
+@instrument("robust_extractor")
 def robust_extractor(x, w, q):
     x = symmetric_mod(x, q)
     return int(symmetric_mod(x + w * (q - 1) / 2, q)) % 2
+
+
+# Whole-polynomial versions of the functions above. They take array (or list) of coefficients and return int64 array.
+
+# n uniformly random bits drawn from one secrets call.
+def random_bits(n):
+    return np.unpackbits(np.frombuffer(token_bytes((n + 7) // 8), dtype=np.uint8))[:n].astype(np.int64)
+
+
+# hint_function for every coefficient of x, b is array of bits.
+def hint_function_poly(x, b, q):
+    x = np.mod(np.asarray(x, dtype=np.int64), q)  # make sure that x is in Z_q
+
+    l_bound = - (q // 4) + b
+    r_bound = q // 4 + b
+
+    return ((r_bound < x) & (x < np.mod(l_bound, q))).astype(np.int64)
+
+
+# Cha(y) for every coefficient of y.
+@instrument("signal_function_poly", args_polys_size(0))
+def signal_function_poly(y, q):
+    y = np.mod(np.asarray(y, dtype=np.int64), q)  # make sure that y is in Z_q
+    b = random_bits(len(y))
+    return hint_function_poly(y, b, q)
+
+
+# Mod_2(x, w) for every coefficient of x and w.
+@instrument("robust_extractor_poly", args_polys_size(0))
+def robust_extractor_poly(x, w, q):
+    assert q % 2 == 1  # (q - 1) / 2 is then an integer, so no floats are needed
+    x = symmetric_mod_array(np.asarray(x, dtype=np.int64), q)
+    return symmetric_mod_array(x + np.asarray(w, dtype=np.int64) * ((q - 1) // 2), q) % 2
+
+
+# Bytes of sigma (one byte per coefficient) which are hashed into the shared key, same as bytes(list_of_sigma).
+def sigma_to_bytes(sigma):
+    return np.asarray(sigma, dtype=np.uint8).tobytes()
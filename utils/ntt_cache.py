@@ -0,0 +1,81 @@
+# Server-side cache of long-lived polynomials (public polynomial a of a realm, verifiers of users) in NTT domain,
+# so that they are not transformed from scratch in every login. Safe to use from several threads.
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.ntt import convert_to_ntt_batch
+
+
+# Keeps (normal form, NTT form) pairs, at most maxsize of them. Least recently used one is evicted first.
+class NTTCache:
+    def __init__(self, q, maxsize=1024):
+        assert maxsize > 0
+        self.q = q
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # Returns (poly, poly in NTT domain) stored under key, poly is transformed and stored on miss.
+    # If poly is passed and differs from the cached one, the entry is replaced, so stale forms are never returned.
+    def _get(self, key, poly):
+        normal = None if poly is None else self._normalize(poly)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (normal is None or entry[0] == normal):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+        assert normal is not None, f"{key} is not cached"
+        with self._lock:
+            self.misses += 1
+        return self._put(key, normal)
+
+    @staticmethod
+    def _normalize(poly):
+        return np.asarray(poly, dtype=np.int64).tolist()  # also from int32 views, e.g. from utils.verifier_store
+
+    def _put(self, key, poly):
+        poly = self._normalize(poly)
+        entry = (poly, convert_to_ntt_batch(np.array([poly]), self.q)[0])  # transformed outside of the lock
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    # Public polynomial a of a realm, (a, a in NTT domain).
+    def public(self, realm, a=None):
+        return self._get(("public", realm), a)
+
+    # Verifier of a user, (v, v in NTT domain).
+    def verifier(self, identity, v=None):
+        return self._get(("verifier", identity), v)
+
+    # (Re-)registration of a verifier replaces whatever was cached for the identity.
+    def register_verifier(self, identity, v):
+        self.invalidate_verifier(identity)
+        return self._put(("verifier", identity), v)
+
+    def invalidate_verifier(self, identity):
+        with self._lock:
+            self._entries.pop(("verifier", identity), None)
+
+    def invalidate_public(self, realm):
+        with self._lock:
+            self._entries.pop(("public", realm), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
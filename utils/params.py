@@ -0,0 +1,59 @@
+# Parameter sets of the protocol. Twiddle tables of NTT for (n, q) are generated and cached at first use
+# (see utils.ntt.get_zetas, set utils.ntt.twiddle_cache_dir or PQSRP_TWIDDLE_CACHE to keep them on disk).
+# Parameter set used by main.py is selected by environment variable PQSRP_PARAMS (name from PARAM_SETS).
+
+import os
+
+from utils import ntt
+
+SAMPLER_BLOCK = 256  # coefficients produced by one call of SampleNTT / SamplePolyCBD (Kyber's algorithms 7 and 8)
+
+
+class ParamSet:
+    # n: degree of x^n + 1, q: modulus, eta: parameter of CBD,
+    # uniform_seed_bytes / noise_seed_bytes: widths of seeds of uniform sampler and of CBD sampler (PRF).
+    def __init__(self, name, n, q, eta, uniform_seed_bytes=33, noise_seed_bytes=32):
+        ntt.check_ntt_friendly(n, q)
+        if n % SAMPLER_BLOCK != 0:
+            raise ValueError(f"n = {n} is not a multiple of {SAMPLER_BLOCK}")
+        if not 0 < 2 * eta < q:
+            raise ValueError(f"eta = {eta} is out of range for q = {q}")
+        if min(uniform_seed_bytes, noise_seed_bytes) < 32:
+            raise ValueError("seeds must have at least 32 bytes")
+        self.name = name
+        self.n = n
+        self.q = q
+        self.eta = eta
+        self.uniform_seed_bytes = uniform_seed_bytes
+        self.noise_seed_bytes = noise_seed_bytes
+
+    def __repr__(self):
+        return f"ParamSet({self.name!r}, n={self.n}, q={self.q}, eta={self.eta})"
+
+    # Primitive 2n-th root of unity the twiddle tables are generated from.
+    @property
+    def psi(self):
+        return ntt.find_psi(self.n, self.q)
+
+    # (zetas, inverted zetas), generated at first use.
+    def zetas(self):
+        return ntt.get_zetas(self.n, self.q)
+
+    # Generates (or loads) twiddle tables now instead of in the first handshake.
+    def warm_up(self):
+        ntt.get_zetas_arrays(self.n, self.q)
+        return self
+
+
+PARAM_SETS = {
+    "pqsrp-1024": ParamSet("pqsrp-1024", 1024, 1073479681, 2),  # Section 4.1
+    "pqsrp-512": ParamSet("pqsrp-512", 512, 1073479681, 2),  # lower latency, e.g. for internal low-risk realms
+}
+DEFAULT_PARAM_SET = "pqsrp-1024"
+
+
+def get_param_set(name=None):
+    name = os.environ.get("PQSRP_PARAMS", DEFAULT_PARAM_SET) if name is None else name
+    if name not in PARAM_SETS:
+        raise ValueError(f"unknown parameter set {name}, available: {', '.join(PARAM_SETS)}")
+    return PARAM_SETS[name]
@@ -0,0 +1,80 @@
+# Array-backed representation of polynomials. Same layout as the list one: x^0, ..., x^n.
+# E.g. 5x^3 + 2x^2 + 1 = Poly.from_list([1, 0, 2, 5], q)
+
+import numpy as np
+
+from utils.infinity_norm import symmetric_mod_array
+
+
+# Polynomial with coefficients modulo q kept in symmetric representation in an int64 NumPy array.
+# For q ~ 2^30 sums and small scalar products of coefficients fit into int64 without overflow.
+class Poly:
+    __slots__ = ("coeffs", "q")
+
+    def __init__(self, coeffs, q):
+        self.coeffs = coeffs
+        self.q = q
+
+    # Creates Poly from list of ints (or bytes, e.g. output of XOF), coefficients are reduced modulo q.
+    @classmethod
+    def from_list(cls, p, q):
+        if isinstance(p, (bytes, bytearray)):
+            coeffs = np.frombuffer(p, dtype=np.uint8).astype(np.int64)
+        else:
+            coeffs = np.array(p, dtype=np.int64)
+        return cls(symmetric_mod_array(coeffs, q), q)
+
+    # Converts Poly back to list of ints as used by utils.polynomial.
+    def to_list(self):
+        return self.coeffs.tolist()
+
+    # Coefficients in symmetric representation [-(q-1)/2, (q-1)/2].
+    def symmetric(self):
+        return self.coeffs
+
+    # Coefficients in canonical representation [0, q-1].
+    def canonical(self):
+        return np.mod(self.coeffs, self.q)
+
+    def _other_coeffs(self, other):
+        if not isinstance(other, Poly):
+            other = Poly.from_list(other, self.q)
+        assert other.q == self.q and len(other) == len(self)
+        return other.coeffs
+
+    def __len__(self):
+        return len(self.coeffs)
+
+    def __eq__(self, other):
+        return isinstance(other, Poly) and self.q == other.q and np.array_equal(self.coeffs, other.coeffs)
+
+    def __repr__(self):
+        return f"Poly({self.to_list()}, q={self.q})"
+
+    # Adds two polynomials modulo q.
+    def __add__(self, other):
+        return Poly(symmetric_mod_array(self.coeffs + self._other_coeffs(other), self.q), self.q)
+
+    __radd__ = __add__
+
+    # Subtracts polynomial other from polynomial self modulo q.
+    def __sub__(self, other):
+        return Poly(symmetric_mod_array(self.coeffs - self._other_coeffs(other), self.q), self.q)
+
+    def __rsub__(self, other):
+        return Poly(symmetric_mod_array(self._other_coeffs(other) - self.coeffs, self.q), self.q)
+
+    # Inverts a polynomial modulo q.
+    def __neg__(self):
+        return Poly(symmetric_mod_array(-self.coeffs, self.q), self.q)
+
+    # Multiplies polynomial by scalar c modulo q.
+    def __mul__(self, c):
+        if not isinstance(c, (int, np.integer)):
+            return NotImplemented
+        c = int(c) % self.q
+        if c > self.q // 2:
+            c -= self.q  # |c| <= q/2 so that the product fits into int64
+        return Poly(symmetric_mod_array(self.coeffs * c, self.q), self.q)
+
+    __rmul__ = __mul__
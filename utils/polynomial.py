@@ -1,9 +1,19 @@
-from utils.infinity_norm import symmetric_mod
+import numpy as np
+
+from utils.encoding import to_fixed_array
+from utils.infinity_norm import symmetric_mod, symmetric_mod_array
+from utils.instrumentation import instrument, args_polys_size, result_size
+from utils.ntt import convert_to_ntt_batch, multiply_ntt_polys_batch, convert_from_ntt_batch
+
+# Backends available for polynomial multiplication. Default one is used whenever mul is called without backend.
+MUL_BACKENDS = ("schoolbook", "ntt")
+mul_backend = "ntt"
 
 
 # Converts array of ints to its byte representation.
+@instrument("poly_to_bytes", result_size)
 def poly_to_bytes(p):
-    return b"".join(x.to_bytes(4, signed=True) for x in p)  # length 4 is sufficient for q = 1073479681 using the representation [-(q-1)/2, (q-1)/2]
+    return to_fixed_array(p, ">i4").tobytes()  # big-endian as int.to_bytes, length 4 is sufficient for q = 1073479681 using the representation [-(q-1)/2, (q-1)/2]
 
 
 # Creates polynomial representing constant c.
@@ -46,6 +56,7 @@ def sub(a, b, q):
 
 
 # Multiply 2 polynomials, coefficients modulo q, polynomials modulo f.
+@instrument("mul_simple", args_polys_size(0, 1))
 def mul_simple(a, b, f, q):
     tmp = [0] * (len(a) * 2 - 1)  # the product of two degree n polynomial cannot exceed 2n
 
@@ -64,3 +75,38 @@ def mul_simple(a, b, f, q):
 
     tmp = list(map(lambda x: symmetric_mod(x, q), tmp))
     return tmp[:degree_f]
+
+
+# Multiply 2 polynomials, coefficients modulo q, polynomials modulo x^n + 1 using NTT (see utils.ntt.get_zetas).
+# Gives the same result as mul_simple (symmetric representation included).
+@instrument("mul_ntt", args_polys_size(0, 1))
+def mul_ntt(a, b, q):
+    a_ntt, b_ntt = convert_to_ntt_batch(np.array([list(a), list(b)]), q)  # list(...) since a or b may be bytes (e.g. u from XOF)
+    product = convert_from_ntt_batch(multiply_ntt_polys_batch(a_ntt, b_ntt, q)[np.newaxis], q)[0]
+    return symmetric_mod_array(product, q).tolist()
+
+
+# Multiply polynomial already in NTT domain (e.g. cached public polynomial or verifier) with polynomial b.
+@instrument("mul_ntt_pretransformed", args_polys_size(0, 1))
+def mul_ntt_pretransformed(a_ntt, b, q):
+    b_ntt = convert_to_ntt_batch(np.array([list(b)]), q)
+    product = convert_from_ntt_batch(multiply_ntt_polys_batch(a_ntt, b_ntt, q), q)[0]
+    return symmetric_mod_array(product, q).tolist()
+
+
+# Sets backend used by mul globally.
+def set_mul_backend(backend):
+    global mul_backend
+    assert backend in MUL_BACKENDS
+    mul_backend = backend
+
+
+# Multiply 2 polynomials, coefficients modulo q, polynomials modulo f.
+# Backend can be chosen per call, otherwise the global one (see set_mul_backend) is used.
+def mul(a, b, f, q, backend=None):
+    backend = mul_backend if backend is None else backend
+    assert backend in MUL_BACKENDS
+    if backend == "ntt":
+        assert len(a) == len(b) == len(f) - 1  # NTT is defined only for multiplication modulo x^n + 1
+        return mul_ntt(a, b, q)
+    return mul_simple(a, b, f, q)
@@ -0,0 +1,153 @@
+# Verifier store backed by a memory-mapped file, so that millions of verifiers can be kept without per-user
+# Python objects and several server processes can share one page-cached file.
+#
+# File layout: header (magic, n, flags) followed by fixed-size records (n coefficients as <i4).
+# Identities are kept in a sidecar file (path + ".ids") as fixed-size records in the same order, so the index is
+# built by reading only the identities and the coefficients are paged in on lookup.
+# Records are only appended. Re-registration appends a new record and the index points to the newest one.
+# Verifiers are stored either in normal form (symmetric representation) or in NTT domain (flag NTT_FORM).
+
+import fcntl
+import os
+import threading
+
+import numpy as np
+
+from utils.encoding import FIXED_DTYPE, to_fixed_array
+from utils.ntt import convert_to_ntt_batch
+
+MAGIC = b"PQSRPVS2"
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("n", "<u4"), ("flags", "<u4")])
+NTT_FORM = 1
+IDENTITY_BYTES = 64
+IDENTITY_DTYPE = np.dtype(f"S{IDENTITY_BYTES}")
+
+
+def record_dtype(n):
+    return np.dtype((FIXED_DTYPE, (n,)))
+
+
+class VerifierStore:
+    # q is needed only for stores in NTT form (verifiers are transformed when registered).
+    def __init__(self, path, n, ntt=False, q=None):
+        assert not ntt or q is not None
+        self.path = path
+        self.identities_path = path + ".ids"
+        self.n = n
+        self.ntt = ntt
+        self.q = q
+        self._dtype = record_dtype(n)
+        self._records = np.empty((0, n), dtype=FIXED_DTYPE)
+        self._index = {}
+        self._lock = threading.RLock()
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            header = np.array([(MAGIC, n, NTT_FORM if ntt else 0)], dtype=HEADER_DTYPE)
+            with open(path, "wb") as f:
+                f.write(header.tobytes())
+            open(self.identities_path, "wb").close()
+        elif not os.path.exists(self.identities_path):
+            open(self.identities_path, "ab").close()
+        self._check_header()
+        self.refresh()
+
+    def _check_header(self):
+        header = np.fromfile(self.path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{self.path} is not a verifier store")
+        if header["n"][0] != self.n or bool(header["flags"][0] & NTT_FORM) != self.ntt:
+            raise ValueError(f"{self.path} stores verifiers with n = {header['n'][0]}, "
+                             f"NTT form = {bool(header['flags'][0] & NTT_FORM)}")
+
+    # Number of complete records. Coefficients are written before identities, so a record counts only when it is
+    # present in both files (a writer may have been interrupted between the two writes).
+    def _count(self):
+        return min((os.path.getsize(self.path) - HEADER_DTYPE.itemsize) // self._dtype.itemsize,
+                   os.path.getsize(self.identities_path) // IDENTITY_DTYPE.itemsize)
+
+    # Maps records appended since last refresh (e.g. by other processes) and adds them to the index.
+    # Only the identities file is read, coefficients are paged in on lookup.
+    def refresh(self):
+        with self._lock:
+            count = self._count()
+            old_count = len(self._records)
+            if count == old_count:
+                return
+            new_identities = np.fromfile(self.identities_path, dtype=IDENTITY_DTYPE, count=count - old_count,
+                                         offset=old_count * IDENTITY_DTYPE.itemsize).tolist()
+            self._records = np.memmap(self.path, dtype=FIXED_DTYPE, mode="r", offset=HEADER_DTYPE.itemsize,
+                                      shape=(count, self.n))
+            self._index.update(zip(new_identities, range(old_count, count)))
+
+    def __len__(self):
+        return len(self._index)
+
+    # Identities missing from the index are looked up once more after refresh(), so records registered through
+    # other handles (e.g. by other server processes) are found.
+    def _position(self, identity):
+        identity = self._encode_identity(identity)
+        if identity not in self._index:
+            self.refresh()
+        return self._index[identity]
+
+    def __contains__(self, identity):
+        try:
+            self._position(identity)
+        except (ValueError, KeyError):
+            return False
+        return True
+
+    def identities(self):
+        return [identity.decode() for identity in self._index]
+
+    @staticmethod
+    def _encode_identity(identity):
+        identity = identity.encode()
+        if len(identity) > IDENTITY_BYTES or identity.endswith(b"\0"):
+            raise ValueError(f"identity must have at most {IDENTITY_BYTES} bytes and not end with a null byte")
+        return identity
+
+    # Returns read-only view of coefficients of the verifier inside the mapped file (no copy), KeyError if missing.
+    # Needs no lock: refresh() maps new records before their identities are added to the index.
+    def lookup(self, identity):
+        position = self._position(identity)  # before reading _records, which refresh() may replace
+        return self._records[position]
+
+    __getitem__ = lookup
+
+    def register(self, identity, v):
+        self.register_many([(identity, v)])
+
+    __setitem__ = register
+
+    # Appends verifiers of many (identity, verifier) pairs with one write per file. Writers in other processes are
+    # serialized by a lock on the store file, and incomplete records left by an interrupted writer are cut off first,
+    # so both files stay in the same order.
+    def register_many(self, items):
+        items = list(items)
+        if not items:
+            return
+        identities = np.array([self._encode_identity(identity) for identity, _ in items], dtype=IDENTITY_DTYPE)
+        coeffs = np.array([np.asarray(v, dtype=np.int64) for _, v in items]).reshape(len(items), self.n)
+        if self.ntt:
+            coeffs = convert_to_ntt_batch(coeffs, self.q)
+        records = to_fixed_array(coeffs)
+        with self._lock, open(self.path, "r+b") as f, open(self.identities_path, "r+b") as ids:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                count = self._count()
+                f.truncate(HEADER_DTYPE.itemsize + count * self._dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(records.tobytes())
+                f.flush()
+                ids.truncate(count * IDENTITY_DTYPE.itemsize)
+                ids.seek(0, os.SEEK_END)
+                ids.write(identities.tobytes())
+                ids.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            self.refresh()
+
+    def close(self):
+        with self._lock:
+            self._records = np.empty((0, self.n), dtype=FIXED_DTYPE)
+            self._index = {}